@@ -19,33 +19,76 @@ import sys
 import argparse
 import pathspec
 import re
+import stat
 from collections import deque
+from decimal import Decimal
+from concurrent.futures import ThreadPoolExecutor
 from enum import Enum, auto 
 from pathspec.patterns.gitwildmatch import GitWildMatchPattern
 
 # --- Stats and Helpers ---
 
+OUTPUT_BUFFER_SIZE = 1024 * 1024
+COPY_CHUNK_SIZE = 1024 * 1024
+# Worker threads used to read files ahead of the writer. Read-ahead only pays
+# off on slow storage; on a cached tree the thread handoff costs more than it saves
+DEFAULT_JOBS = 1
+_HEADER_BAR = "=" * 80
+# The dump's own lines end with LF on every platform; file contents are
+# copied as they are
+_HEADER_START = f'\n//{_HEADER_BAR}\n// File: '.encode('utf-8')
+_HEADER_END = f'\n//{_HEADER_BAR}\n\n'.encode('utf-8')
+# Like git, a NUL byte in the first 8000 bytes marks a file as binary
+BINARY_SNIFF_SIZE = 8000
+# Known binary formats, skipped without being opened (lowercase, no dots)
+BINARY_EXTENSIONS = frozenset({
+    'png', 'jpg', 'jpeg', 'gif', 'bmp', 'ico', 'webp', 'tif', 'tiff', 'psd',
+    'zip', 'gz', 'tgz', 'bz2', 'xz', '7z', 'rar', 'tar', 'jar', 'war', 'nupkg',
+    'exe', 'dll', 'so', 'dylib', 'lib', 'a', 'o', 'obj', 'pdb', 'class', 'pyc', 'pyo', 'msi',
+    'pdf', 'doc', 'docx', 'xls', 'xlsx', 'ppt', 'pptx',
+    'mp3', 'wav', 'ogg', 'flac', 'mp4', 'avi', 'mov', 'mkv', 'webm',
+    'ttf', 'otf', 'woff', 'woff2', 'eot', 'db', 'sqlite',
+})
+_BINARY_SKIPPED = b'// Binary file skipped\n'
+
 class Stats:
     """A simple class to hold statistics for the dump."""
+    # Counters are bumped once per scanned file, so skip the instance dict
+    __slots__ = ('scanned_files', 'included_files', 'skipped_files', 'binary_files')
+
     def __init__(self):
         self.scanned_files = 0
         self.included_files = 0
         self.skipped_files = 0
+        # Binary files are also counted in skipped_files
+        self.binary_files = 0
+
+    def skip_binary(self, included=False):
+        """Counts a binary file as skipped; included if it was counted as included first."""
+        if included:
+            self.included_files -= 1
+        self.skipped_files += 1
+        self.binary_files += 1
 
     def print_summary(self, file_path, total_bytes, dry_run=False):
-        """Prints the final summary to stderr."""
+        """
+        Prints the final summary to stderr.
+        total_bytes is the output file size, or None if it was not created.
+        """
         print("\n" + ("-" * 20) + " Dump Summary " + ("-" * 20), file=sys.stderr)
         if dry_run:
             print("Mode:           --dry-run (no file written)", file=sys.stderr)
         else:
             print(f"Output File:    {file_path}", file=sys.stderr)
-            if os.path.exists(file_path):
+            if total_bytes is not None:
                  print(f"File Size:      {human_readable_size(total_bytes)}", file=sys.stderr)
             else:
                  print("File Size:      0 B (File not created or empty)", file=sys.stderr)
 
         print(f"Files Included: {self.included_files}", file=sys.stderr)
         print(f"Files Skipped:  {self.skipped_files}", file=sys.stderr)
+        if self.binary_files:
+            print(f"  Binary Files: {self.binary_files}", file=sys.stderr)
         print(f"Total Scanned:  {self.scanned_files}", file=sys.stderr)
         print("-" * 54, file=sys.stderr)
 
@@ -59,6 +102,25 @@ def human_readable_size(size, decimal_places=2):
         size /= 1024.0
     return f"{size:.{decimal_places}f} {unit}"
 
+_SIZE_RE = re.compile(r'(\d+(?:\.\d*)?)\s*(?:([KMG])(?:I?B)?|B)?', re.IGNORECASE)
+
+def parse_size(text):
+    """Parses a --max-file-size value: bytes, or a number with a K/M/G (KiB/MiB/GiB) suffix."""
+    # Plain digits only, so 'inf', 'nan', exponents and signs are all refused
+    m = _SIZE_RE.fullmatch(text.strip())
+    if not m:
+        raise argparse.ArgumentTypeError(f"invalid size: {text!r}")
+    number, unit = m.groups()
+    multiplier = 1024 ** ('KMG'.index(unit.upper()) + 1) if unit else 1
+    return int(Decimal(number) * multiplier)
+
+def get_file_size(path):
+    """Returns the size of path with a single stat, or None if it is missing."""
+    try:
+        return os.stat(path).st_size
+    except OSError:
+        return None
+
 def normalize_cli_path(raw_path):
     """
     Normalizes input paths:
@@ -72,12 +134,17 @@ def normalize_cli_path(raw_path):
     # 1. Normalize Slashes
     path = raw_path.strip().replace('\\', '/')
 
-    # 2. Check filesystem existence
-    if os.path.isfile(path):
+    # 2. Check filesystem existence (a single stat covers both file and dir)
+    try:
+        mode = os.stat(path).st_mode
+    except (OSError, ValueError):
+        mode = 0
+
+    if stat.S_ISREG(mode):
         # Logic: If it's a specific file, we want to FORCE include it usually
         return True, path
     
-    elif os.path.isdir(path):
+    elif stat.S_ISDIR(mode):
         # Logic: If it's a directory, user likely wants recursive content
         # unless they already added a wildcard
         if '*' not in path and '?' not in path:
@@ -110,54 +177,97 @@ class FilterOutcome(Enum):
     EXPLICIT_EXCLUDE = auto() # Matched a 'exclude' rule (e.g., *, *.log)
     DEFAULT_INCLUDE = auto()  # No rule matched
 
+# Hoisted for the per-file checks, where enum attribute lookups add up
+_FORCE_INCLUDE = FilterOutcome.FORCE_INCLUDE
+_EXPLICIT_EXCLUDE = FilterOutcome.EXPLICIT_EXCLUDE
+_GITIGNORE_CHECKED = (FilterOutcome.ADDITIVE_INCLUDE, FilterOutcome.DEFAULT_INCLUDE)
+
+class Stage1Ruleset:
+    """
+    An ordered list of compiled Stage 1 rules as (pattern, outcome, rule_line)
+    tuples, plus a single regex that finds the winning (last matching) rule
+    for a path in one call instead of a Python loop over every rule.
+    """
+    def __init__(self, rules):
+        self.rules = rules
+        self.matcher, self.groups = compile_rule_union(rules)
+        self.has_force_rules = any(o == FilterOutcome.FORCE_INCLUDE for _, o, _ in rules)
+
 # --- Git & Filesystem ---
 
 _git_root_cache = {}
 
 def find_git_root(start_path):
     """Finds the git repository root by searching upwards for a .git directory."""
-    abs_start_path = os.path.abspath(start_path)
-    
-    for cached_path, root in _git_root_cache.items():
-        if abs_start_path.startswith(cached_path):
-            return root
+    path = os.path.abspath(start_path)
+    visited = []
 
-    path = abs_start_path
     while True:
+        if path in _git_root_cache:
+            root = _git_root_cache[path]
+            break
+        visited.append(path)
+
         if os.path.isdir(os.path.join(path, '.git')):
-            _git_root_cache[abs_start_path] = path
-            return path
-        
+            root = path
+            break
+
         parent = os.path.dirname(path)
         if parent == path:
-            _git_root_cache[abs_start_path] = None
-            return None
+            root = None
+            break
         path = parent
 
+    # Every directory passed on the way up resolves to the same root
+    for visited_path in visited:
+        _git_root_cache[visited_path] = root
+    return root
+
 def find_root_gitignore(start_path):
-    """Finds the .gitignore file in the git root, if it exists."""
+    """
+    Returns the path of the .gitignore file in the git root, or None outside
+    a repository. The file itself may be missing; load_rules_from_file
+    already treats that as no rules, so it is not stat'ed here first.
+    """
     git_root = find_git_root(start_path)
     if git_root:
-        gitignore_path = os.path.join(git_root, '.gitignore')
-        if os.path.isfile(gitignore_path):
-            return gitignore_path
+        return os.path.join(git_root, '.gitignore')
     return None
 
+def load_root_gitignore_spec(start_path):
+    """Compiles the git root's .gitignore, or returns None if it has no rules."""
+    gitignore_rules = load_rules_from_file(find_root_gitignore(start_path))
+    if not gitignore_rules:
+        return None
+    return pathspec.PathSpec.from_lines('gitwildmatch', gitignore_rules)
+
 def load_rules_from_file(file_path):
     """
     Safely reads a .gitignore-style file and returns a list of rules.
     """
-    if not file_path or not os.path.isfile(file_path):
+    if not file_path:
         return []
     
     rules = []
     try:
-        with open(file_path, 'r', encoding='utf-8') as f:
-            for line in f:
-                # Normalize any slashes in the filter file immediately
-                line = line.strip().replace('\\', '/')
-                if line and not line.startswith('#'):
-                    rules.append(line)
+        # Opened directly: callers usually know the file exists from a
+        # directory listing, so a separate isfile() stat would be wasted.
+        with open(file_path, 'rb') as f:
+            data = f.read()
+        # bytes.splitlines() splits exactly where universal newlines would
+        for raw_line in data.splitlines():
+            # Blank and comment lines are dropped before paying for a decode
+            raw_line = raw_line.strip()
+            if not raw_line or raw_line.startswith(b'#'):
+                continue
+            # Normalize any slashes in the filter file immediately
+            line = raw_line.decode('utf-8').strip().replace('\\', '/')
+            if line and not line.startswith('#'):
+                rules.append(line)
+    except OSError as e:
+        # A missing path or a directory means "no rules", as before
+        if os.path.isfile(file_path):
+            print(f"Warning: Could not read rules from {file_path}. Error: {e}", file=sys.stderr)
     except Exception as e:
         print(f"Warning: Could not read rules from {file_path}. Error: {e}", file=sys.stderr)
     return rules
@@ -171,21 +281,26 @@ def get_unique_output_filename(base_path):
     directory = os.path.dirname(base) or '.'
     filename_base = os.path.basename(base)
     
-    pattern = re.compile(fr"^{re.escape(filename_base)}(?:_(\d+))?{re.escape(ext)}$")
+    # Candidates look like '<base><ext>' or '<base>_<digits><ext>'
+    min_len = len(filename_base) + len(ext)
     
     max_num = -1
     base_file_exists = False
 
     try:
-        for filename in os.listdir(directory):
-            match = pattern.match(filename)
-            if match:
-                if match.group(1):
-                    num = int(match.group(1))
+        with os.scandir(directory) as it:
+            for entry in it:
+                filename = entry.name
+                if (len(filename) < min_len or not filename.startswith(filename_base)
+                        or not filename.endswith(ext)):
+                    continue
+                suffix = filename[len(filename_base):len(filename) - len(ext)]
+                if not suffix:
+                    base_file_exists = True
+                elif suffix[0] == '_' and suffix[1:].isdecimal():
+                    num = int(suffix[1:])
                     if num > max_num:
                         max_num = num
-                else:
-                    base_file_exists = True
     except FileNotFoundError:
         return base_path
 
@@ -211,24 +326,159 @@ def load_allowed_extensions(exts_file_path):
                 line = line.strip().lower()
                 if not line or line.startswith('#'):
                     continue
-                if not line.startswith('.'):
-                    line = '.' + line
+                # Stored without the dot, to match what process_file extracts
+                if line.startswith('.'):
+                    line = line[1:]
                 extensions.add(line)
         
         if not extensions:
             print(f"Warning: Extension file '{exts_file_path}' was empty. Including all file extensions.", file=sys.stderr)
             return None
-        return extensions
+        return frozenset(extensions)
     except FileNotFoundError:
         print(f"Error: Extensions file '{exts_file_path}' not found. Aborting.", file=sys.stderr)
         sys.exit(1)
 
+def scan_directory(path):
+    """
+    Lists a directory once via os.scandir and splits it into (dirs, files).
+    Entries are classified like os.walk does (symlinks to directories count
+    as directories), but using the DirEntry type cache instead of extra stats.
+    Returns None if the directory cannot be read.
+    """
+    dirs = []
+    files = []
+    try:
+        with os.scandir(path) as it:
+            for entry in it:
+                try:
+                    is_dir = entry.is_dir()
+                except OSError:
+                    is_dir = False
+                if is_dir:
+                    if entry.name != '.git':
+                        dirs.append(entry)
+                else:
+                    files.append(entry)
+    except OSError:
+        return None
+    return dirs, files
+
+def walk_tree(top, executor=None, prefetch=0):
+    """
+    Top-down directory walk built on os.scandir, replacing os.walk.
+    Yields (root, dir_entries, file_entries); '.git' is never listed.
+    As with os.walk(topdown=True), callers may prune dir_entries in place,
+    and symlinked directories are listed but not descended into.
+    With an executor, the next `prefetch` directories due to be visited are
+    listed ahead on its threads; the visiting order stays the same.
+    """
+    stack = [top]
+    pending = {}
+    while stack:
+        root = stack.pop()
+        future = pending.pop(root, None)
+        scanned = future.result() if future else scan_directory(root)
+        if scanned is None:
+            continue
+        dirs, files = scanned
+        yield root, dirs, files
+        # Reversed so that subdirectories are visited in listing order
+        stack.extend(d.path for d in reversed(dirs) if not d.is_symlink())
+        if executor is not None:
+            # Only the top of the stack, so wide trees don't queue every listing
+            for path in stack[-prefetch:]:
+                if path not in pending:
+                    pending[path] = executor.submit(scan_directory, path)
+
+def walk_tree_relative(top, root_dir, executor=None, prefetch=0):
+    """
+    Like walk_tree, but yields (root, prefix, dirs, files), where prefix is
+    root relative to root_dir with '/' separators and a trailing '/' ('' for
+    root_dir itself). When top is inside root_dir, only top goes through
+    os.path.relpath and every other prefix is sliced off the absolute path.
+    """
+    top_rel = os.path.relpath(top, root_dir).replace("\\", "/")
+    top_prefix = "" if top_rel == '.' else top_rel + "/"
+    top_abs_prefix = top if top.endswith(os.sep) else top + os.sep
+    # Above root_dir the walk can pass back into it, where relpath drops the '../'
+    inside_root = not top_prefix.startswith('../')
+
+    for root, dirs, files in walk_tree(top, executor, prefetch):
+        if root == top:
+            prefix = top_prefix
+        elif inside_root:
+            prefix = top_prefix + root[len(top_abs_prefix):].replace(os.sep, "/") + "/"
+        else:
+            rel_root = os.path.relpath(root, root_dir).replace("\\", "/")
+            prefix = "" if rel_root == '.' else rel_root + "/"
+        yield root, prefix, dirs, files
+
 # --- New Core Filter Logic ---
 
-def compile_stage_1_rules(rules_list):
-    """Compiles a list of rule strings into (pattern, outcome) tuples."""
-    compiled_rules = []
+_NAMED_GROUP_RE = re.compile(r'\(\?P<\w+>')
+
+def compile_pattern_union(patterns):
+    """
+    Joins the regexes of compiled gitwildmatch patterns into one alternation
+    with a named group per pattern, 'r<index into patterns>'. The patterns are
+    joined last to first, so the group that matches belongs to the last
+    matching pattern, which is the one that decides. Returns None if no
+    pattern can match.
+    """
+    alternatives = []
+    for index in range(len(patterns) - 1, -1, -1):
+        pattern = patterns[index]
+        if pattern.include is None:
+            continue
+        # Named groups would clash between patterns; only the match itself matters
+        src = _NAMED_GROUP_RE.sub('(?:', pattern.regex.pattern)
+        alternatives.append(f'(?P<r{index}>{src})')
+    if not alternatives:
+        return None
+    return re.compile('|'.join(alternatives))
+
+def compile_rule_union(rules):
+    """
+    Builds the union regex for a list of compiled Stage 1 rules. Returns
+    (matcher, groups), where groups maps a group name to its (outcome, rule_line).
+    """
+    matcher = compile_pattern_union([pattern for pattern, _, _ in rules])
+    groups = {f'r{index}': (outcome, rule_line) for index, (_, outcome, rule_line) in enumerate(rules)}
+    return matcher, groups
+
+# Union regexes for .gitignore specs, by id(spec). The spec is kept in the
+# value so that its id cannot be reused while the entry exists.
+_spec_matchers = {}
+
+def get_spec_matcher(spec):
+    """Returns the (cached) union regex of a gitignore PathSpec."""
+    entry = _spec_matchers.get(id(spec))
+    if entry is None:
+        entry = _spec_matchers[id(spec)] = (spec, compile_pattern_union(spec.patterns))
+    return entry[1]
+
+def spec_matches(spec, rel_path):
+    """Same result as spec.match_file(rel_path), in a single regex call."""
+    matcher = get_spec_matcher(spec)
+    m = matcher.match(rel_path) if matcher else None
+    return bool(m) and spec.patterns[int(m.lastgroup[1:])].include
+
+# Compiled (pattern, outcome) per rule line. Hierarchical mode recompiles the
+# inherited rules for every .dumpignore, so each line is only built once.
+_pattern_cache = {}
+
+def compile_stage_1_rules(rules_list, parent_ruleset=None):
+    """
+    Compiles a list of rule strings into a Stage1Ruleset. With parent_ruleset,
+    the new rules are appended to its already compiled rules.
+    """
+    compiled_rules = list(parent_ruleset.rules) if parent_ruleset else []
     for rule_line in rules_list:
+        cached = _pattern_cache.get(rule_line)
+        if cached is not None:
+            compiled_rules.append((cached[0], cached[1], rule_line))
+            continue
         try:
             if rule_line.startswith('!'):
                 pattern_str = rule_line[1:].strip()
@@ -244,47 +494,200 @@ def compile_stage_1_rules(rules_list):
                 outcome = FilterOutcome.ADDITIVE_INCLUDE # Default to Additive for patterns
             
             pattern = GitWildMatchPattern(pattern_str)
+            _pattern_cache[rule_line] = (pattern, outcome)
             compiled_rules.append((pattern, outcome, rule_line))
         except Exception as e:
             print(f"Warning: Invalid filter rule '{rule_line}' ignored. Error: {e}", file=sys.stderr)
-    return compiled_rules
+    return Stage1Ruleset(compiled_rules)
 
-def get_stage_1_outcome(file_path, compiled_stage_1_rules):
-    """Finds the last matching Stage 1 rule for a file."""
-    winning_outcome = FilterOutcome.DEFAULT_INCLUDE
-    winning_rule = None
+def get_stage_1_outcome_fast(file_path, compiled_stage_1_rules):
+    """Finds the outcome of the last matching Stage 1 rule for a file."""
+    if not compiled_stage_1_rules.rules:
+        return FilterOutcome.DEFAULT_INCLUDE
 
-    # If explicit rules exist, default switches to EXPLICIT_EXCLUDE unless matched
-    if compiled_stage_1_rules:
-         winning_outcome = FilterOutcome.EXPLICIT_EXCLUDE
+    matcher = compiled_stage_1_rules.matcher
+    m = matcher.match(file_path) if matcher else None
+    if not m:
+        return FilterOutcome.EXPLICIT_EXCLUDE
+    return compiled_stage_1_rules.groups[m.lastgroup][0]
 
-    for pattern, outcome, rule_line in compiled_stage_1_rules:
-        if pattern.match_file(file_path):
-            winning_outcome = outcome
-            winning_rule = rule_line
-            
-    return winning_outcome, winning_rule
+def get_stage_1_outcome_debug(file_path, compiled_stage_1_rules):
+    """Like get_stage_1_outcome_fast, but also returns the winning rule line for --debug."""
+    if not compiled_stage_1_rules.rules:
+        return FilterOutcome.DEFAULT_INCLUDE, None
+
+    # If explicit rules exist, default switches to EXPLICIT_EXCLUDE unless matched
+    matcher = compiled_stage_1_rules.matcher
+    m = matcher.match(file_path) if matcher else None
+    if not m:
+        return FilterOutcome.EXPLICIT_EXCLUDE, None
+    return compiled_stage_1_rules.groups[m.lastgroup]
 
-def check_nested_gitignore(file_abs_path, current_dir_abs, gitignore_specs_map):
+def get_active_gitignores(current_dir_abs, gitignore_specs_map):
     """
-    Checks if a file is ignored by any .gitignore in the directory hierarchy
-    starting from current_dir_abs up to the root.
+    Collects the .gitignore specs that apply inside current_dir_abs, from
+    that directory up to the root, as (base_prefix, spec) pairs. This is done
+    once per directory, so its files need no ancestor climb of their own.
     """
+    active_gitignores = []
     check_path = current_dir_abs
     while True:
         spec = gitignore_specs_map.get(check_path)
         if spec:
-            rel_path = os.path.relpath(file_abs_path, check_path).replace('\\', '/')
-            if spec.match_file(rel_path):
-                return True
-        
+            base_prefix = check_path if check_path.endswith(os.sep) else check_path + os.sep
+            active_gitignores.append((base_prefix, spec))
+
         parent = os.path.dirname(check_path)
-        if parent == check_path: 
+        if parent == check_path:
             break
         check_path = parent
-        
+
+    return active_gitignores
+
+def inherit_active_gitignores(current_dir_abs, gitignore_specs_map, active_cache):
+    """
+    Like get_active_gitignores, but reuses the parent directory's result from
+    active_cache during a top-down walk, so only the walk's first directory
+    climbs the ancestor chain. Directories without a spec of their own share
+    their parent's list.
+    """
+    parent = os.path.dirname(current_dir_abs)
+    inherited = active_cache.get(parent) if parent != current_dir_abs else None
+    if inherited is None:
+        active_gitignores = get_active_gitignores(current_dir_abs, gitignore_specs_map)
+    else:
+        spec = gitignore_specs_map.get(current_dir_abs)
+        if spec:
+            active_gitignores = [(current_dir_abs + os.sep, spec)] + inherited
+        else:
+            active_gitignores = inherited
+    active_cache[current_dir_abs] = active_gitignores
+    return active_gitignores
+
+def check_nested_gitignore(file_abs_path, active_gitignores):
+    """Checks if a file is ignored by any of the .gitignore files above it."""
+    for base_prefix, spec in active_gitignores:
+        # The file is known to be below base_prefix, so slicing is its relpath
+        rel_path = file_abs_path[len(base_prefix):].replace('\\', '/')
+        if spec_matches(spec, rel_path):
+            return True
     return False
 
+def pattern_could_match_under(pattern_str, dir_path):
+    """
+    Conservatively decides whether a gitwildmatch pattern could match any
+    path inside dir_path (relative, no trailing slash). Only patterns that
+    are anchored to a literal path diverging from dir_path are ruled out.
+    """
+    pattern_str = pattern_str.lstrip('!').rstrip('/')
+    if pattern_str.startswith('/'):
+        pattern_str = pattern_str[1:]
+    elif '/' not in pattern_str:
+        # Unanchored patterns match at any depth
+        return True
+
+    for pattern_part, dir_part in zip(pattern_str.split('/'), dir_path.split('/')):
+        if not pattern_part or any(c in pattern_part for c in '*?[\\'):
+            return True
+        if pattern_part != dir_part:
+            return False
+    return True
+
+def stage_1_excludes_dir(dir_path, compiled_stage_1_rules):
+    """Checks if every file below dir_path is bound to end up EXPLICIT_EXCLUDE."""
+    rules = compiled_stage_1_rules.rules
+    if not rules:
+        return False
+
+    # A rule matching 'dir/' matches everything below it; the union regex
+    # finds the last such rule in one call
+    matcher = compiled_stage_1_rules.matcher
+    m = matcher.match(dir_path + '/') if matcher else None
+    first_later_rule = int(m.lastgroup[1:]) + 1 if m else 0
+
+    # Later rules can still pull individual files back in
+    for pattern, outcome, rule_line in rules[first_later_rule:]:
+        if (outcome != FilterOutcome.EXPLICIT_EXCLUDE and pattern.include is not None
+                and pattern_could_match_under(pattern.pattern, dir_path)):
+            return False
+
+    if m:
+        return compiled_stage_1_rules.groups[m.lastgroup][0] == FilterOutcome.EXPLICIT_EXCLUDE
+    # No rule can include anything below, so the explicit-mode default applies
+    return True
+
+def has_force_rule_under(dir_path, compiled_stage_1_rules):
+    """Checks if any '!' rule could match a file below dir_path."""
+    for pattern, outcome, rule_line in compiled_stage_1_rules.rules:
+        if (outcome == FilterOutcome.FORCE_INCLUDE and pattern.include is not None
+                and pattern_could_match_under(pattern.pattern, dir_path)):
+            return True
+    return False
+
+def spec_ignores_dir(spec, dir_path):
+    """Checks if a gitignore spec ignores every path below dir_path."""
+    probe = dir_path + '/'
+    for pattern in reversed(spec.patterns):
+        if pattern.include is None:
+            continue
+        if pattern.match_file(probe):
+            return pattern.include
+        if not pattern.include and pattern_could_match_under(pattern.pattern, dir_path):
+            return False
+    return False
+
+def check_nested_gitignore_dir(dir_abs_path, active_gitignores):
+    """Checks if a directory is wholly ignored by one of the .gitignore files above it."""
+    for base_prefix, spec in active_gitignores:
+        rel_path = dir_abs_path[len(base_prefix):].replace('\\', '/')
+        if spec_ignores_dir(spec, rel_path):
+            return True
+    return False
+
+def get_dir_prune_reason(dir_path, dir_abs_path, compiled_stage_1_rules, active_gitignores):
+    """
+    Decides if a directory can be skipped without walking it, because no file
+    below it could be included. Returns the reason, or None to descend.
+    """
+    if stage_1_excludes_dir(dir_path, compiled_stage_1_rules):
+        return "excluded by rules"
+
+    # Stage 2 only ever skips files; a '!' rule below would override it
+    if active_gitignores and not has_force_rule_under(dir_path, compiled_stage_1_rules):
+        if check_nested_gitignore_dir(dir_abs_path, active_gitignores):
+            return "ignored by .gitignore"
+
+    return None
+
+def prune_dirs(dirs, prefix, compiled_stage_1_rules, active_gitignores, args, decision_cache):
+    """
+    Removes directories that cannot contain included files from dirs, in place.
+    prefix is the relative path of their parent with a trailing '/', or ''.
+    decision_cache keeps the decisions of one run, for directories that
+    overlapping input dirs reach again. A directory's active .gitignore specs
+    do not change within a run, so the ruleset is the only other input; it is
+    stored alongside the reason so that its id stays unique.
+    """
+    # Without rules or .gitignore specs there is nothing to prune by
+    if not compiled_stage_1_rules.rules and not active_gitignores:
+        return
+
+    kept = []
+    for d in dirs:
+        d_path = prefix + d.name
+        key = (d.path, id(compiled_stage_1_rules))
+        cached = decision_cache.get(key)
+        if cached is not None:
+            reason = cached[1]
+        else:
+            reason = get_dir_prune_reason(d_path, d.path, compiled_stage_1_rules, active_gitignores)
+            decision_cache[key] = (compiled_stage_1_rules, reason)
+        if reason is None:
+            kept.append(d)
+        elif args.debug:
+            print(f"[PRUNE]   {d_path}/ ({reason})", file=sys.stderr)
+    dirs[:] = kept
+
 # --- Core Logic ---
 
 def build_static_rulesets(args, root_dir):
@@ -308,128 +711,332 @@ def build_static_rulesets(args, root_dir):
     # --- Build Stage 2 Ruleset (Project Ignores) ---
     stage_2_gitignore_spec = None
     if not args.no_gitignore:
-        gitignore_path = find_root_gitignore(root_dir)
-        if gitignore_path:
-            gitignore_rules = load_rules_from_file(gitignore_path)
-            if gitignore_rules:
-                stage_2_gitignore_spec = pathspec.PathSpec.from_lines(
-                    'gitwildmatch',
-                    gitignore_rules
-                )
+        stage_2_gitignore_spec = load_root_gitignore_spec(root_dir)
 
     return compiled_stage_1_rules, stage_2_gitignore_spec
 
-def write_file_content(outfile, file_path, header_path):
-    """Writes a single file's content to the main output file."""
-    outfile.write('\n')
-    outfile.write(f'//{"=" * 80}\n')
-    outfile.write(f'// File: {header_path}\n')
-    outfile.write(f'//{"=" * 80}\n\n')
+def read_ahead(file_path):
+    """
+    Prepares a file for the writer, on a worker thread when read ahead.
+    Small files are read whole and returned as bytes. Larger ones are
+    returned as (open binary file, size when opened) after asking the kernel
+    to start reading them in the background, so the writer's streamed copy
+    mostly finds the data already cached.
+    """
+    infile = open(file_path, 'rb')
     try:
-        with open(file_path, 'r', encoding='utf-8', errors='ignore') as infile:
-            outfile.write(infile.read())
-            outfile.write('\n')
-        outfile.flush()
+        size = os.fstat(infile.fileno()).st_size
+        if size <= COPY_CHUNK_SIZE:
+            with infile:
+                return infile.read()
+        if hasattr(os, 'posix_fadvise'):
+            os.posix_fadvise(infile.fileno(), 0, 0, os.POSIX_FADV_WILLNEED)
+    except BaseException:
+        infile.close()
+        raise
+    return infile, size
+
+def copy_file_stream(infile, outfile, size):
+    """
+    Copies a large binary file into the output, up to size, its length when
+    it was opened, so a file that keeps growing meanwhile (a log, or the dump
+    itself) cannot keep the copy going. Where os.sendfile exists the kernel
+    copies it between the two descriptors directly; if it refuses (e.g.
+    macOS, which only sends to sockets), the rest is read in chunks, so large
+    files are never held in memory whole either way.
+    """
+    offset = infile.tell()
+    if hasattr(os, 'sendfile'):
+        try:
+            # Buffered header bytes must reach the file before the kernel's copy
+            outfile.flush()
+            out_fd, in_fd = outfile.fileno(), infile.fileno()
+            while offset < size:
+                sent = os.sendfile(out_fd, in_fd, offset, min(COPY_CHUNK_SIZE, size - offset))
+                if not sent:
+                    # The file shrank since it was opened
+                    return
+                offset += sent
+            return
+        except OSError:
+            # Read errors come back from the chunked copy below
+            pass
+    infile.seek(offset)
+    while offset < size:
+        chunk = infile.read(min(COPY_CHUNK_SIZE, size - offset))
+        if not chunk:
+            break
+        outfile.write(chunk)
+        offset += len(chunk)
+
+def looks_binary(data):
+    """Checks the start of a file's content for a NUL byte."""
+    return data.find(b'\0', 0, BINARY_SNIFF_SIZE) != -1
+
+def write_file_content(outfile, file_path, header_path, prefetched=None, include_binary=False):
+    """
+    Writes a single file's content to the main output file (opened in binary
+    mode). File bytes are copied verbatim, without a decode/encode round-trip.
+    prefetched is an optional future from read_ahead for this file.
+    Binary files get a note instead of their content unless include_binary;
+    returns True in that case.
+    """
+    outfile.write(_HEADER_START + header_path.encode('utf-8', 'replace') + _HEADER_END)
+    is_binary = False
+    try:
+        content = prefetched.result() if prefetched else read_ahead(file_path)
+        if isinstance(content, bytes):
+            if not include_binary and looks_binary(content):
+                outfile.write(_BINARY_SKIPPED)
+                is_binary = True
+            else:
+                outfile.write(content)
+        else:
+            infile, size = content
+            with infile:
+                # Only the head is sniffed, so large text files still stream
+                head = infile.read(BINARY_SNIFF_SIZE)
+                if not include_binary and looks_binary(head):
+                    outfile.write(_BINARY_SKIPPED)
+                    is_binary = True
+                else:
+                    outfile.write(head)
+                    copy_file_stream(infile, outfile, size)
+        outfile.write(b'\n')
     except Exception as e:
-        outfile.write(f"// Error reading file: {e}\n\n")
+        outfile.write(f"// Error reading file: {e}\n\n".encode('utf-8', 'replace'))
         print(f"Warning: Could not read file {file_path}. Error: {e}", file=sys.stderr)
+    return is_binary
+
+class DumpWriter:
+    """
+    Writes included files to the dump in the order they are added.
+    With more than one job, files are read ahead on a thread pool so that
+    disk latency overlaps with writing; the output order stays the same.
+    """
+    def __init__(self, outfile, jobs, include_binary=False, stats=None):
+        self.outfile = outfile
+        self.jobs = jobs
+        self.include_binary = include_binary
+        # Files found to be binary only once read are moved to its binary count
+        self.stats = stats
+        # The dump itself may lie inside a scanned tree; it is recognised by
+        # (st_dev, st_ino), or by path where the filesystem has no file ids
+        self.output_id = self.output_path = None
+        st = os.fstat(outfile.fileno())
+        if stat.S_ISREG(st.st_mode):
+            if st.st_ino:
+                self.output_id = (st.st_dev, st.st_ino)
+            self.output_path = os.path.normcase(os.path.abspath(outfile.name))
+        self.executor = ThreadPoolExecutor(max_workers=jobs) if jobs > 1 else None
+        self.max_pending = jobs * 4
+        self.pending = deque()
+
+    def write_file(self, file_path, header_path):
+        if self.executor is None:
+            self._written(write_file_content(self.outfile, file_path, header_path, include_binary=self.include_binary))
+            return
+
+        future = self.executor.submit(read_ahead, file_path)
+        self.pending.append((file_path, header_path, future))
+        while len(self.pending) > self.max_pending:
+            self._write_next()
+
+    def _write_next(self):
+        file_path, header_path, future = self.pending.popleft()
+        self._written(write_file_content(self.outfile, file_path, header_path, future, self.include_binary))
+
+    def is_output_file(self, path, st):
+        """Checks if a file, given its path and stat result, is the dump being written."""
+        if self.output_id is not None and st.st_ino:
+            return (st.st_dev, st.st_ino) == self.output_id
+        return self.output_path is not None and os.path.normcase(os.path.abspath(path)) == self.output_path
+
+    def _written(self, is_binary):
+        if is_binary and self.stats is not None:
+            self.stats.skip_binary(included=True)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if self.executor is None:
+            return
+        if exc_type is None:
+            while self.pending:
+                self._write_next()
+        self.executor.shutdown(cancel_futures=True)
+        # On error, large files opened ahead of the writer are still open
+        while self.pending:
+            future = self.pending.popleft()[2]
+            if not future.cancelled() and future.exception() is None:
+                result = future.result()
+                if isinstance(result, tuple):
+                    result[0].close()
+
+def has_extension_in(name, extensions):
+    """Checks a file name's extension against a set (lowercased, without dots), like --exts."""
+    # Same split as os.path.splitext: leading dots do not start an extension
+    head, dot, file_ext = name.rpartition('.')
+    return bool(head.lstrip('.')) and file_ext.lower() in extensions
+
+def claim_file(entry, f_path, processed_files, max_file_size=None, is_output_file=None):
+    """
+    Records an accepted file in processed_files. Returns why it has to be
+    skipped instead, or None: it is not a regular file (reading a FIFO or a
+    device could block forever), it is the dump being written (checked with
+    is_output_file(path, stat_result)), it is larger than max_file_size, or
+    the same file was already included, under this path or another spelling
+    of it (symlinks, overlapping input dirs), judged by its (st_dev, st_ino).
+    """
+    try:
+        st = entry.stat()
+        if not st.st_ino:
+            # On Windows DirEntry.stat() leaves the file id at 0; os.stat fills it in
+            st = os.stat(entry.path)
+    except OSError:
+        # Left to the reader, which reports the error in the dump
+        st = None
+
+    file_id = None
+    if st is not None:
+        if not stat.S_ISREG(st.st_mode):
+            return "not a regular file"
+        if is_output_file is not None and is_output_file(entry.path, st):
+            return "the output file"
+        if max_file_size is not None and st.st_size > max_file_size:
+            return "larger than --max-file-size"
+        if st.st_ino:
+            file_id = (st.st_dev, st.st_ino)
+
+    if file_id in processed_files:
+        return "same file already included"
+    # Paths are kept too, for the walkers' cheap check on overlapping input dirs
+    processed_files.add(f_path)
+    if file_id is not None:
+        processed_files.add(file_id)
+    return None
+
+def reject_file(entry, f_path, processed_files, stats, args, writer):
+    """
+    Last checks on a file that passed filtering, before it is claimed and
+    written. Known binary formats are turned away by extension here, so they
+    are never opened. Counts and reports a rejected file and returns True.
+    """
+    if not writer.include_binary and has_extension_in(entry.name, BINARY_EXTENSIONS):
+        skip_reason = "binary file"
+        stats.skip_binary()
+    else:
+        skip_reason = claim_file(entry, f_path, processed_files, args.max_file_size, writer.is_output_file)
+        if not skip_reason:
+            return False
+        stats.skipped_files += 1
+    if args.debug:
+        print(f"[SKIP]    {f_path} ({skip_reason})", file=sys.stderr)
+    return True
 
 def process_file(
-    f, f_path, root, 
+    entry, f_path, 
     compiled_stage_1_rules, 
-    gitignore_specs_map, 
+    active_gitignores, 
     allowed_extensions, 
     processed_files, 
     stats, 
     args, 
-    outfile
+    writer
 ):
     """Processes a single file using the new Two-Stage Filter logic."""
+    debug = args.debug
     stats.scanned_files += 1
 
-    if f_path in processed_files:
+    # Only a '!' rule lets a file past the extension filter, so without any
+    # such rule a wrong extension settles it before the pattern matching.
+    # Debug runs take the full path, to report the same reasons as before.
+    if (allowed_extensions is not None and not debug
+            and not compiled_stage_1_rules.has_force_rules
+            and not has_extension_in(entry.name, allowed_extensions)):
+        stats.skipped_files += 1
         return
 
     # --- STAGE 1: User Rules (.dumpignore, --rule, --filter-file) ---
-    stage_1_outcome, winning_rule = get_stage_1_outcome(f_path, compiled_stage_1_rules)
+    if debug:
+        stage_1_outcome, winning_rule = get_stage_1_outcome_debug(f_path, compiled_stage_1_rules)
+    else:
+        stage_1_outcome = get_stage_1_outcome_fast(f_path, compiled_stage_1_rules)
 
     # --- STAGE 2: Project Ignores (.gitignore) ---
     is_ignored_by_stage_2 = False
     
     # Only check gitignore if it wasn't forcefully included or explicitly excluded
-    if stage_1_outcome in (FilterOutcome.ADDITIVE_INCLUDE, FilterOutcome.DEFAULT_INCLUDE):
-        if gitignore_specs_map:
-            abs_file_path = os.path.join(root, f)
-            abs_root_path = os.path.abspath(root)
-            is_ignored_by_stage_2 = check_nested_gitignore(abs_file_path, abs_root_path, gitignore_specs_map)
-
-    # --- STAGE 3: Extension Filter (Optional) ---
-    ext_matched = True
-    if allowed_extensions is not None:
-        file_ext = os.path.splitext(f)[1].lower()
-        if not file_ext or file_ext not in allowed_extensions:
-            ext_matched = False
+    if stage_1_outcome in _GITIGNORE_CHECKED:
+        if active_gitignores:
+            is_ignored_by_stage_2 = check_nested_gitignore(entry.path, active_gitignores)
 
     # --- FINAL DECISION ---
     
     # 1. Check for Force Include (bypasses all other checks)
-    if stage_1_outcome == FilterOutcome.FORCE_INCLUDE:
+    if stage_1_outcome is _FORCE_INCLUDE:
         # Note: We usually interpret Force Include as "Even if extension doesn't match"
         # But for safety, strict extension matching is usually better unless specific file
+        if reject_file(entry, f_path, processed_files, stats, args, writer):
+            return
         stats.included_files += 1
-        if args.debug:
+        if debug:
             print(f"[INCLUDE] {f_path} (matched FORCE rule: {winning_rule})", file=sys.stderr)
         
         if not args.dry_run:
-            full_path = os.path.join(root, f)
-            write_file_content(outfile, full_path, f_path)
-            processed_files.add(f_path)
+            writer.write_file(entry.path, f_path)
         return
 
     # 2. Check for Explicit Exclude
-    if stage_1_outcome == FilterOutcome.EXPLICIT_EXCLUDE:
+    if stage_1_outcome is _EXPLICIT_EXCLUDE:
         stats.skipped_files += 1
-        if args.debug:
+        if debug:
             print(f"[SKIP]    {f_path} (matched rule: {winning_rule})", file=sys.stderr)
         return
 
     # 3. Check for Stage 2 (gitignore) Ignore
     if is_ignored_by_stage_2:
         stats.skipped_files += 1
-        if args.debug:
+        if debug:
             print(f"[SKIP]    {f_path} (ignored by .gitignore)", file=sys.stderr)
         return
 
-    # 4. Check for Extension Filter
-    if not ext_matched:
+    # 4. Check for Extension Filter (STAGE 3, optional). Only reached by files
+    # that passed the earlier stages, so skipped files never pay for it.
+    if allowed_extensions is not None and not has_extension_in(entry.name, allowed_extensions):
         stats.skipped_files += 1
-        if args.debug:
+        if debug:
             print(f"[SKIP]    {f_path} (extension mismatch)", file=sys.stderr)
         return
 
     # 5. Include
+    if reject_file(entry, f_path, processed_files, stats, args, writer):
+        return
     stats.included_files += 1
-    if args.debug:
+    if debug:
         print(f"[INCLUDE] {f_path} (Included)", file=sys.stderr)
     
     if not args.dry_run:
-        full_path = os.path.join(root, f)
-        write_file_content(outfile, full_path, f_path)
-        processed_files.add(f_path)
+        writer.write_file(entry.path, f_path)
 
 def walk_and_process_static(
-    outfile, input_dirs, root_dir, 
+    writer, input_dirs, root_dir, 
     compiled_stage_1_rules, 
     stage_2_gitignore_spec,
     allowed_extensions, stats, args
 ):
     """Processes files using a static set of rules."""
     processed_files = set()
+    # One walk never yields a path twice; only overlapping input dirs can
+    revisits_possible = len(input_dirs) > 1
+    prune_decisions = {}
     
     gitignore_map = {}
     if stage_2_gitignore_spec:
         # Assuming static run is usually from root context
         gitignore_map[os.path.abspath(root_dir)] = stage_2_gitignore_spec
+    active_cache = {}
 
     for input_dir in input_dirs:
         abs_input_dir = os.path.abspath(input_dir)
@@ -438,90 +1045,107 @@ def walk_and_process_static(
             # But process_cli_args ensures we only pass valid parents.
             continue
             
-        for root, dirs, files in os.walk(abs_input_dir, topdown=True):
-            if '.git' in dirs:
-                dirs.remove('.git')
+        for root, prefix, dirs, files in walk_tree_relative(abs_input_dir, root_dir, writer.executor, writer.jobs):
 
-            rel_root = os.path.relpath(root, root_dir).replace("\\", "/")
-            dir_paths = [f"{rel_root}/{d}/" if rel_root != '.' else f"{d}/" for d in dirs]
-            file_paths = [f"{rel_root}/{f}" if rel_root != '.' else f"{f}" for f in files]
+            # Only prune directories no rule could ever pull a file back out of,
+            # e.g. '*' followed by '+*.py' must still descend everywhere.
+            active_gitignores = inherit_active_gitignores(root, gitignore_map, active_cache)
+            prune_dirs(dirs, prefix, compiled_stage_1_rules, active_gitignores, args, prune_decisions)
 
-            # We don't filter DIRS here in static mode because strict file rules 
-            # might require descending into a dir that is technically "excluded" by default.
-            
-            for f, f_path in zip(files, file_paths):
+            for f in files:
+                f_path = prefix + f.name
+                if revisits_possible and f_path in processed_files:
+                    continue
                 process_file(
-                    f, f_path, root, 
+                    f, f_path, 
                     compiled_stage_1_rules, 
-                    gitignore_map, 
-                    allowed_extensions, processed_files, stats, args, outfile
+                    active_gitignores, 
+                    allowed_extensions, processed_files, stats, args, writer
                 )
 
 def walk_and_process_hierarchical(
-    outfile, input_dirs, root_dir, 
+    writer, input_dirs, root_dir, 
     base_compiled_stage_1_rules,
     root_gitignore_spec,
     allowed_extensions, stats, args
 ):
     """Processes files using hierarchical .dumpignore and .gitignore files."""
     processed_files = set()
+    # One walk never yields a path twice; only overlapping input dirs can
+    revisits_possible = len(input_dirs) > 1
+    prune_decisions = {}
     rules_cache = {root_dir: base_compiled_stage_1_rules}
-    raw_rules_cache = {root_dir: []}
+    # Rulesets built from a parent ruleset plus a .dumpignore's rules, so that
+    # sibling directories with identical .dumpignore files share one ruleset
+    ruleset_cache = {}
     
     gitignore_specs_map = {}
     if root_gitignore_spec:
         git_root_path = find_git_root(root_dir)
         if git_root_path:
              gitignore_specs_map[git_root_path] = root_gitignore_spec
+    active_cache = {}
 
     for input_dir in input_dirs:
         abs_input_dir = os.path.abspath(input_dir)
         if not os.path.isdir(abs_input_dir):
             continue
 
-        for root, dirs, files in os.walk(abs_input_dir, topdown=True):
-            if '.git' in dirs:
-                dirs.remove('.git')
+        for root, prefix, dirs, files in walk_tree_relative(abs_input_dir, root_dir, writer.executor, writer.jobs):
+            # Ignore files are picked up from the listing we already have,
+            # instead of probing the filesystem for them in every directory.
+            ignore_files = {f.name: f for f in files if f.name in ('.dumpignore', '.gitignore')}
 
             parent_dir = os.path.dirname(root)
             if root == root_dir or root == abs_input_dir:
                  parent_compiled_rules = base_compiled_stage_1_rules
-                 parent_raw_rules = [] 
             else:
                  parent_compiled_rules = rules_cache.get(parent_dir, base_compiled_stage_1_rules)
-                 parent_raw_rules = raw_rules_cache.get(parent_dir, [])
 
             current_compiled_rules = parent_compiled_rules
-            current_raw_rules = parent_raw_rules
             
             if not args.no_dumpignore:
-                dumpignore_path = os.path.join(root, '.dumpignore')
-                if os.path.isfile(dumpignore_path):
-                    new_rules = load_rules_from_file(dumpignore_path)
+                dumpignore_entry = ignore_files.get('.dumpignore')
+                if dumpignore_entry:
+                    new_rules = load_rules_from_file(dumpignore_entry.path)
                     if new_rules:
-                        current_raw_rules = parent_raw_rules + new_rules
-                        current_compiled_rules = compile_stage_1_rules(current_raw_rules)
+                        new_rules = tuple(new_rules)
+                        # Parent rulesets stay alive in rules_cache, so their ids are stable
+                        key = (id(parent_compiled_rules), new_rules)
+                        current_compiled_rules = ruleset_cache.get(key)
+                        if current_compiled_rules is None:
+                            # Inherited rules are reused already compiled; only
+                            # this .dumpignore's own lines need compiling
+                            current_compiled_rules = compile_stage_1_rules(new_rules, parent_compiled_rules)
+                            ruleset_cache[key] = current_compiled_rules
             
             rules_cache[root] = current_compiled_rules
-            raw_rules_cache[root] = current_raw_rules
             
             if not args.no_gitignore:
-                gitignore_path = os.path.join(root, '.gitignore')
-                if os.path.isfile(gitignore_path):
-                    new_git_rules = load_rules_from_file(gitignore_path)
+                gitignore_entry = ignore_files.get('.gitignore')
+                # The git root's .gitignore is preloaded, and overlapping
+                # input dirs can revisit a directory; either way it is known
+                if gitignore_entry and root not in gitignore_specs_map:
+                    new_git_rules = load_rules_from_file(gitignore_entry.path)
                     if new_git_rules:
                         spec = pathspec.PathSpec.from_lines('gitwildmatch', new_git_rules)
                         gitignore_specs_map[root] = spec
 
-            rel_root = os.path.relpath(root, root_dir).replace("\\", "/")
-            file_paths = [f"{rel_root}/{f}" if rel_root != '.' else f"{f}" for f in files]
+            # A nested .dumpignore may add rules for anything below this point,
+            # so subtrees can only be pruned when those are disabled.
+            active_gitignores = inherit_active_gitignores(root, gitignore_specs_map, active_cache)
+            if args.no_dumpignore:
+                prune_dirs(dirs, prefix, current_compiled_rules, active_gitignores, args, prune_decisions)
 
-            for f, f_path in zip(files, file_paths):
+            for f in files:
+                f_path = prefix + f.name
+                if revisits_possible and f_path in processed_files:
+                    continue
                 process_file(
-                    f, f_path, root, 
+                    f, f_path, 
                     current_compiled_rules, 
-                    gitignore_specs_map, 
-                    allowed_extensions, processed_files, stats, args, outfile
+                    active_gitignores, 
+                    allowed_extensions, processed_files, stats, args, writer
                 )
 
 
@@ -585,7 +1209,8 @@ def collect_source_files(args, root_dir):
         # Since we converted CLI args to rules, this is usually True now
         is_explicit_mode = (args.rule is not None and len(args.rule) > 0) or args.filter_file
         
-        with open(os.devnull, 'w') if args.dry_run else open(output_file, 'w', encoding='utf-8') as outfile:
+        with open(os.devnull, 'wb') if args.dry_run else open(output_file, 'wb', buffering=OUTPUT_BUFFER_SIZE) as outfile, \
+             DumpWriter(outfile, args.jobs, args.include_binary, stats) as writer:
             
             if is_explicit_mode:
                 if args.debug:
@@ -593,7 +1218,7 @@ def collect_source_files(args, root_dir):
                 compiled_stage_1_rules, stage_2_gitignore_spec = build_static_rulesets(args, root_dir)
                 # Note: We pass is_explicit_mode=True (unused in static, but logically consistent)
                 walk_and_process_static(
-                    outfile, args.input_dirs, root_dir,
+                    writer, args.input_dirs, root_dir,
                     compiled_stage_1_rules, stage_2_gitignore_spec,
                     allowed_extensions, stats, args
                 )
@@ -601,34 +1226,34 @@ def collect_source_files(args, root_dir):
                 if args.debug:
                     print("Running in Hierarchical Mode (Default).", file=sys.stderr)
                 
-                base_compiled_stage_1_rules = []
+                base_compiled_stage_1_rules = compile_stage_1_rules([])
                 root_gitignore_spec = None
                 if not args.no_gitignore:
-                    gitignore_path = find_root_gitignore(root_dir)
-                    if gitignore_path:
-                         gitignore_rules = load_rules_from_file(gitignore_path)
-                         if gitignore_rules:
-                            root_gitignore_spec = pathspec.PathSpec.from_lines('gitwildmatch', gitignore_rules)
+                    root_gitignore_spec = load_root_gitignore_spec(root_dir)
                 
                 walk_and_process_hierarchical(
-                    outfile, args.input_dirs, root_dir,
+                    writer, args.input_dirs, root_dir,
                     base_compiled_stage_1_rules, root_gitignore_spec,
                     allowed_extensions, stats, args
                 )
 
+        if args.fsync and not args.dry_run:
+            # Written data is flushed once the file is closed; this forces it
+            # to disk. Opened for writing, which Windows needs for the sync.
+            with open(output_file, 'ab') as synced:
+                os.fsync(synced.fileno())
+
     except Exception as e:
         print(f"\nAn unexpected error occurred: {e}", file=sys.stderr)
-        if not args.dry_run and os.path.exists(output_file) and os.path.getsize(output_file) == 0:
+        if not args.dry_run and get_file_size(output_file) == 0:
             os.remove(output_file)
         sys.exit(1)
 
-    total_bytes = 0
-    if not args.dry_run and os.path.exists(output_file):
-        total_bytes = os.path.getsize(output_file)
+    total_bytes = None if args.dry_run else get_file_size(output_file)
         
     stats.print_summary(output_file, total_bytes, args.dry_run)
     
-    if not args.dry_run and total_bytes == 0 and os.path.exists(output_file):
+    if not args.dry_run and total_bytes == 0:
         print("\nWarning: No matching files were found to process.", file=sys.stderr)
         # os.remove(output_file) # Optional: remove empty files
     elif args.dry_run:
@@ -651,12 +1276,20 @@ def main():
     parser.add_argument("--exts", metavar="<path>", help="Allowed extensions file.")
     parser.add_argument("--debug", action="store_true", help="Enable verbose logging.")
     parser.add_argument("--dry-run", action="store_true", help="Run without writing output.")
+    parser.add_argument("--max-file-size", type=parse_size, metavar="<size>",
+                        help="Skip files larger than this, in bytes or with a K/M/G suffix (e.g. 512K, 16M).")
+    parser.add_argument("--include-binary", action="store_true", help="Dump files that look binary instead of skipping their content.")
+    parser.add_argument("--fsync", action="store_true", help="Sync the output file to disk before exiting.")
+    parser.add_argument("--jobs", type=int, default=DEFAULT_JOBS, metavar="<n>",
+                        help="Threads reading files ahead of the writer (default: 1 = no threads).")
 
     if len(sys.argv) == 1:
         parser.print_help(sys.stderr)
         sys.exit(1)
         
     args = parser.parse_args()
+    if args.jobs < 1:
+        parser.error("--jobs must be at least 1")
     root_dir = os.path.abspath(os.getcwd())
     collect_source_files(args, root_dir)
 
@@ -0,0 +1,122 @@
+import os
+import subprocess
+import sys
+import tempfile
+import unittest
+from types import SimpleNamespace
+from unittest import mock
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+import dump
+
+DUMP_SCRIPT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "dump.py")
+
+
+class FakeEntry:
+    """A DirEntry whose stat() has no file id, as on Windows."""
+    def __init__(self, path):
+        self.path = path
+        self.name = os.path.basename(path)
+
+    def stat(self):
+        return zero_inode(os.stat(self.path))
+
+
+def zero_inode(st):
+    return SimpleNamespace(st_mode=st.st_mode, st_size=st.st_size, st_dev=0, st_ino=0)
+
+
+class ZeroInodeTests(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.src = os.path.join(self.tmp.name, "a.py")
+        with open(self.src, "w") as f:
+            f.write("print('a')\n")
+        self.out_path = os.path.join(self.tmp.name, "out.txt")
+        self.outfile = open(self.out_path, "wb")
+        self.addCleanup(self.outfile.close)
+
+    def test_falls_back_to_os_stat(self):
+        writer = dump.DumpWriter(self.outfile, 1)
+        processed = set()
+        self.assertEqual(dump.claim_file(FakeEntry(self.out_path), self.out_path, processed,
+                                         is_output_file=writer.is_output_file), "the output file")
+        self.assertIsNone(dump.claim_file(FakeEntry(self.src), self.src, processed))
+        link = os.path.join(self.tmp.name, "link.py")
+        os.link(self.src, link)
+        self.assertEqual(dump.claim_file(FakeEntry(link), link, processed), "same file already included")
+
+    def test_output_file_recognised_by_path_without_file_ids(self):
+        real_stat, real_fstat = os.stat, os.fstat
+        with mock.patch.object(os, "fstat", lambda fd: zero_inode(real_fstat(fd))), \
+             mock.patch.object(os, "stat", lambda p, *a, **kw: zero_inode(real_stat(p, *a, **kw))):
+            writer = dump.DumpWriter(self.outfile, 1)
+            self.assertIsNone(writer.output_id)
+            processed = set()
+            self.assertEqual(dump.claim_file(FakeEntry(self.out_path), self.out_path, processed,
+                                             is_output_file=writer.is_output_file), "the output file")
+            self.assertIsNone(dump.claim_file(FakeEntry(self.src), self.src, processed,
+                                              is_output_file=writer.is_output_file))
+            self.assertIn(self.src, processed)
+
+
+class OutputInsideTreeTests(unittest.TestCase):
+    def test_dump_inside_scanned_tree_stays_bounded(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            content = "".join(f"{i}\n" for i in range(300000))
+            with open(os.path.join(tmp, "a.txt"), "w") as f:
+                f.write(content)
+            out_path = os.path.join(tmp, "out.txt")
+            for jobs in ("1", "4"):
+                with self.subTest(jobs=jobs):
+                    if os.path.exists(out_path):
+                        os.remove(out_path)
+                    subprocess.run([sys.executable, DUMP_SCRIPT, tmp, out_path, "--jobs", jobs, "--rule=!*"],
+                                   check=True, capture_output=True, timeout=60)
+                    with open(out_path, "rb") as f:
+                        data = f.read()
+                    self.assertEqual(data.count(b"// File: "), 1)
+                    self.assertLess(len(data), len(content) + 1024)
+
+
+class DumpWriterTests(unittest.TestCase):
+    def test_error_exit_closes_files_read_ahead(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            paths = []
+            for i in range(3):
+                paths.append(os.path.join(tmp, f"big{i}.txt"))
+                with open(paths[-1], "wb") as f:
+                    f.write(b"x" * (dump.COPY_CHUNK_SIZE + 1))
+            with open(os.path.join(tmp, "out.txt"), "wb") as out:
+                with self.assertRaises(KeyboardInterrupt):
+                    with dump.DumpWriter(out, 2) as writer:
+                        for path in paths:
+                            writer.write_file(path, os.path.basename(path))
+                        futures = [item[2] for item in writer.pending]
+                        for future in futures:
+                            future.result()
+                        raise KeyboardInterrupt
+            self.assertFalse(writer.pending)
+            for future in futures:
+                self.assertTrue(future.result()[0].closed)
+
+
+class WriteFileContentTests(unittest.TestCase):
+    def test_header_bytes_use_lf_and_contents_are_copied_as_is(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            src = os.path.join(tmp, "a.py")
+            with open(src, "wb") as f:
+                f.write(b"one\r\ntwo\r\n")
+            out_path = os.path.join(tmp, "out.txt")
+            with open(out_path, "wb") as out:
+                dump.write_file_content(out, src, "src/a.py")
+            with open(out_path, "rb") as f:
+                data = f.read()
+        bar = b"//" + b"=" * 80
+        self.assertEqual(data, b"\n" + bar + b"\n// File: src/a.py\n" + bar + b"\n\n"
+                               b"one\r\ntwo\r\n\n")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -2,78 +2,119 @@
 # 2. in google disk, download the file as json
 # 3. use this utility to extract the conversion to a separate file
 
+import itertools
 import json
 import os
 import sys
 
+# Optional: ijson streams the chunks one at a time instead of loading the
+# whole export into memory (pip install ijson). Falls back to json otherwise.
+try:
+    import ijson
+except ImportError:
+    ijson = None
+
 # --- CONFIGURATION ---
 # Base length for the separator lines
 SEPARATOR_LENGTH = 60
 SKIP_THOUGHTS = True
 
+JSON_ERRORS = (json.JSONDecodeError, ijson.JSONError) if ijson else (json.JSONDecodeError,)
+# Marks "no chunk read", since a chunk itself may be null
+_NO_CHUNK = object()
+
+def load_chunks(f):
+    """Returns an iterator over the chat chunks, or None if the JSON has none."""
+    if ijson is None:
+        data = json.load(f)
+        if 'chunkedPrompt' not in data or 'chunks' not in data['chunkedPrompt']:
+            return None
+        return iter(data['chunkedPrompt']['chunks'])
+
+    chunks = ijson.items(f, 'chunkedPrompt.chunks.item')
+    # Read up to the first chunk so a missing array is reported before any output
+    first = next(chunks, _NO_CHUNK)
+    if first is _NO_CHUNK:
+        # Either an empty array or no array at all; only a rescan can tell
+        f.seek(0)
+        if next(ijson.items(f, 'chunkedPrompt.chunks'), _NO_CHUNK) is _NO_CHUNK:
+            return None
+        return iter(())
+    return itertools.chain((first,), chunks)
+
 def extract_text_from_json(input_path, output_path):
     if not os.path.exists(input_path):
         print(f"Error: Input file '{input_path}' not found.")
         return
 
+    partial_path = None
     try:
-        with open(input_path, 'r', encoding='utf-8') as f:
-            data = json.load(f)
-        
-        if 'chunkedPrompt' not in data or 'chunks' not in data['chunkedPrompt']:
-            print("Error: JSON structure does not match expected AI Studio format (missing 'chunkedPrompt').")
-            return
-
-        chunks = data['chunkedPrompt']['chunks']
-        
-        with open(output_path, 'w', encoding='utf-8') as out:
-            count = 0
-            
-            for chunk in chunks:
-                # Get role (usually 'user' or 'model')
-                role = chunk.get('role', 'unknown').lower()
-                text = chunk.get('text', '')
-                is_thought = chunk.get('isThought', False)
-
-                # Handle 'parts' list if top-level text is empty
-                if not text and 'parts' in chunk:
-                    parts_text = []
-                    for part in chunk['parts']:
-                        if 'text' in part:
-                            parts_text.append(part['text'])
-                    text = "".join(parts_text)
-                
-                # Skip empty chunks
-                if not text:
-                    continue
-
-                # Skip thoughts if configured
-                if is_thought and SKIP_THOUGHTS:
-                    continue
-
-                # Prepare the label for the separator
-                label = role
-                if is_thought:
-                    label = f"{role} (thought)"
-
-                # Build the dynamic separator: "--- user --------------------"
-                # 4 chars for initial "--- ", then label, then space, then fill remaining with "-"
-                dash_count = max(5, SEPARATOR_LENGTH - len(label) - 5)
-                separator = f"--- {label} " + ("-" * dash_count)
-
-                # Write to file
-                out.write(f"{separator}\n")
-                out.write(text.strip())
-                out.write("\n\n")
-                
-                count += 1
+        with open(input_path, 'rb') as f:
+            chunks = load_chunks(f)
+
+            if chunks is None:
+                print("Error: JSON structure does not match expected AI Studio format (missing 'chunkedPrompt').")
+                return
+
+            # Chunks are streamed, so a decode error can come after some
+            # output; it is written aside and only moved in place on success
+            partial_path = output_path + '.part'
+            with open(partial_path, 'w', encoding='utf-8') as out:
+                count = 0
+                separators = {}
+
+                for chunk in chunks:
+                    # Get role (usually 'user' or 'model')
+                    role = chunk.get('role', 'unknown').lower()
+                    text = chunk.get('text', '')
+                    is_thought = chunk.get('isThought', False)
+
+                    # Handle 'parts' list if top-level text is empty
+                    if not text and 'parts' in chunk:
+                        parts_text = []
+                        for part in chunk['parts']:
+                            if 'text' in part:
+                                parts_text.append(part['text'])
+                        text = "".join(parts_text)
+
+                    # Skip empty chunks
+                    if not text:
+                        continue
+
+                    # Skip thoughts if configured
+                    if is_thought and SKIP_THOUGHTS:
+                        continue
+
+                    # Prepare the label for the separator
+                    label = role
+                    if is_thought:
+                        label = f"{role} (thought)"
+
+                    # Build the dynamic separator: "--- user --------------------"
+                    # 4 chars for initial "--- ", then label, then space, then fill remaining with "-"
+                    # Only a handful of labels exist, so each separator is built once
+                    separator = separators.get(label)
+                    if separator is None:
+                        dash_count = max(5, SEPARATOR_LENGTH - len(label) - 5)
+                        separator = separators[label] = f"--- {label} " + ("-" * dash_count)
+
+                    # Write to file
+                    out.write(f"{separator}\n{text.strip()}\n\n")
+
+                    count += 1
+
+            os.replace(partial_path, output_path)
+            partial_path = None
 
         print(f"Successfully extracted {count} messages to '{output_path}'.")
 
-    except json.JSONDecodeError:
+    except JSON_ERRORS:
         print("Error: Failed to decode JSON. Please check if the file is valid.")
     except Exception as e:
         print(f"An unexpected error occurred: {e}")
+    finally:
+        if partial_path is not None and os.path.exists(partial_path):
+            os.remove(partial_path)
 
 if __name__ == "__main__":
     if len(sys.argv) < 3:
@@ -0,0 +1,74 @@
+import io
+import os
+import sys
+import tempfile
+import unittest
+from contextlib import redirect_stdout
+from unittest import mock
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+import extract_chat
+
+# Each test runs with the json fallback and, when installed, with ijson
+PARSERS = [None] + ([extract_chat.ijson] if extract_chat.ijson else [])
+
+
+class ExtractChatTests(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.input_path = os.path.join(self.tmp.name, "chat.json")
+        self.output_path = os.path.join(self.tmp.name, "chat.txt")
+
+    def extract(self, data, parser):
+        with open(self.input_path, "w", encoding="utf-8") as f:
+            f.write(data)
+        stdout = io.StringIO()
+        with mock.patch.object(extract_chat, "ijson", parser), redirect_stdout(stdout):
+            extract_chat.extract_text_from_json(self.input_path, self.output_path)
+        return stdout.getvalue()
+
+    def read_output(self):
+        with open(self.output_path, encoding="utf-8") as f:
+            return f.read()
+
+    def test_empty_chunk_array_writes_empty_output(self):
+        for parser in PARSERS:
+            with self.subTest(ijson=parser is not None):
+                message = self.extract('{"chunkedPrompt": {"chunks": []}}', parser)
+                self.assertIn("extracted 0 messages", message)
+                self.assertEqual(self.read_output(), "")
+                os.remove(self.output_path)
+
+    def test_missing_chunks_is_reported(self):
+        for data in ('{"other": 1}', '{"chunkedPrompt": {"other": []}}'):
+            for parser in PARSERS:
+                with self.subTest(data=data, ijson=parser is not None):
+                    message = self.extract(data, parser)
+                    self.assertIn("does not match expected AI Studio format", message)
+                    self.assertFalse(os.path.exists(self.output_path))
+
+    def test_chunks_are_extracted(self):
+        data = ('{"chunkedPrompt": {"chunks": ['
+                '{"role": "user", "text": " hi "}, '
+                '{"role": "model", "text": "thinking", "isThought": true}, '
+                '{"role": "model", "parts": [{"text": "hel"}, {"text": "lo"}]}]}}')
+        for parser in PARSERS:
+            with self.subTest(ijson=parser is not None):
+                self.extract(data, parser)
+                self.assertEqual(self.read_output(),
+                                 "--- user " + "-" * 51 + "\nhi\n\n"
+                                 "--- model " + "-" * 50 + "\nhello\n\n")
+
+    def test_parse_error_leaves_no_output(self):
+        data = '{"chunkedPrompt": {"chunks": [{"role": "user", "text": "hi"}, {"role": '
+        for parser in PARSERS:
+            with self.subTest(ijson=parser is not None):
+                message = self.extract(data, parser)
+                self.assertIn("Failed to decode JSON", message)
+                self.assertFalse(os.path.exists(self.output_path))
+                self.assertFalse(os.path.exists(self.output_path + ".part"))
+
+
+if __name__ == "__main__":
+    unittest.main()